@@ -1,12 +1,28 @@
 import streamlit as st
 import json
+import io
 import PyPDF2
 import pdfplumber
 import fitz  # PyMuPDF
 from openai import AzureOpenAI
 import re
-from typing import Dict, List, Optional
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the json module
+    orjson = None
+
+try:
+    import tiktoken
+except ImportError:  # Optional; fall back to character-based truncation
+    tiktoken = None
 
 # Page config
 st.set_page_config(
@@ -21,58 +37,42 @@ AZURE_OPENAI_ENDPOINT = "https://pbjai.openai.azure.com/"
 AZURE_OPENAI_API_VERSION = "2024-08-01-preview"
 AZURE_OPENAI_CHAT_DEPLOYMENT = "gpt-4o-mini"
 
-class KFRMetadataExtractor:
-    def __init__(self, api_key: str):
-        self.client = AzureOpenAI(
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            api_key=api_key,
-            api_version=AZURE_OPENAI_API_VERSION
-        )
-    
-    def extract_text_from_pdf(self, pdf_file) -> str:
-        """Extract text from PDF using multiple methods for maximum accuracy"""
-        text_content = ""
-        
-        try:
-            # Method 1: PyMuPDF for clean text extraction
-            pdf_bytes = pdf_file.read()
-            pdf_file.seek(0)  # Reset file pointer
-            
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text_content += f"\n--- Page {page_num + 1} ---\n"
-                text_content += page.get_text()
-            doc.close()
-            
-            # Method 2: pdfplumber for tables (if PyMuPDF text is insufficient)
-            if len(text_content.strip()) < 1000:  # Fallback if text is too short
-                pdf_file.seek(0)
-                with pdfplumber.open(pdf_file) as pdf:
-                    for i, page in enumerate(pdf.pages):
-                        text_content += f"\n--- Page {i + 1} (pdfplumber) ---\n"
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_content += page_text
-                        
-                        # Extract tables
-                        tables = page.extract_tables()
-                        for j, table in enumerate(tables):
-                            text_content += f"\n[Table {j+1} on Page {i+1}]\n"
-                            for row in table:
-                                if row:
-                                    text_content += " | ".join([str(cell) if cell else "" for cell in row]) + "\n"
-            
-        except Exception as e:
-            st.error(f"Error extracting text: {str(e)}")
-            return ""
-        
-        return text_content
-    
-    def create_extraction_prompt(self, text: str, user_inputs: Dict) -> str:
-        """Create optimized prompt for metadata extraction"""
-        
-        system_prompt = """
+# Entries kept per process-wide cache (extracted PDF text, parsed metadata)
+CACHE_MAX_ENTRIES = 64
+
+# Document text budget: the prompt keeps MAX_PROMPT_TOKENS tokens of the
+# document. Extraction stops once EXTRACT_STOP_CHARS are collected, sized from
+# the token budget at ~4 characters per token with 1.5x headroom for page
+# markers and the headers/footers stripped afterwards. MAX_EXTRACT_CHARS is
+# only the character fallback when tiktoken is unavailable.
+MAX_PROMPT_TOKENS = 12000
+CHARS_PER_TOKEN = 4
+EXTRACT_STOP_CHARS = MAX_PROMPT_TOKENS * CHARS_PER_TOKEN * 3 // 2
+MAX_EXTRACT_CHARS = 30000
+
+# Fields that must be filled in metadata_umum
+REQUIRED_UMUM_FIELDS = ("judul_dokumen", "periode", "wilayah", "kategori")
+
+# Header/footer stripping: lines within HEADER_FOOTER_WINDOW of a page edge
+# that appear on more than HEADER_FOOTER_MIN_SHARE of pages are dropped
+HEADER_FOOTER_WINDOW = 3
+HEADER_FOOTER_MIN_SHARE = 0.6
+HEADER_FOOTER_MIN_PAGES = 5
+
+# Seconds between UI refreshes while the model response streams in
+STREAM_RENDER_INTERVAL = 0.2
+
+# Bulk mode: documents per Azure OpenAI request, output tokens budgeted per
+# document, and how many batch requests run at once
+BATCH_MAX_DOCS = 4
+BATCH_TOKENS_PER_DOC = 4000
+BATCH_MAX_WORKERS = 4
+
+# Bytes of the JSON export shown in the on-screen preview
+JSON_PREVIEW_BYTES = 100 * 1024
+
+# Prompt templates; kept byte-identical across calls to enable prompt caching
+_SYSTEM_PROMPT = """
 Anda adalah AI khusus untuk ekstraksi metadata dokumen Kajian Fiskal Regional (KFR) DJPb.
 
 STRUKTUR STANDAR KFR:
@@ -129,40 +129,331 @@ CRITICAL INSTRUCTIONS:
 - Output harus berupa JSON valid
 - Fokus pada akurasi, bukan kelengkapan
 
-OUTPUT FORMAT:
-```json
+OUTPUT FORMAT (objek JSON saja, tanpa code block):
 {
   "metadata_umum": {...},
   "metadata_analisis_khusus": {...},
   "metadata_tabel_strategis": [{...}, {...}]
 }
-```
 """
-        
-        user_prompt = f"""
+
+_USER_PROMPT_HEADER = """
+TUGAS:
+Ekstrak metadata sesuai format yang diminta. Prioritaskan akurasi dan konsistensi.
+Jika ada informasi dari user yang bertentangan dengan dokumen, gunakan informasi dari dokumen.
+
 DOKUMEN KFR UNTUK DIANALISIS:
+"""
+
+_BATCH_SYSTEM_PROMPT = _SYSTEM_PROMPT + """
+MODE BATCH:
+- Input berisi beberapa dokumen, masing-masing diawali penanda <<<DOC_0>>>, <<<DOC_1>>>, dst.
+- Ekstrak metadata setiap dokumen secara terpisah; jangan mencampur informasi antar dokumen.
+- Kembalikan satu objek JSON {"documents": [...]} berisi satu objek per DOC_i, masing-masing dengan OUTPUT FORMAT di atas.
+- Setiap objek WAJIB memiliki field "doc_index" berisi angka i dari penanda DOC_i, contoh: {"doc_index": 0, "metadata_umum": {...}, ...}
+"""
+
+# Fenced JSON block, for responses that wrap the object in ```json ... ```
+_JSON_BLOCK = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+# Short standalone number inside a text line, so "hal 5" and "hal 6" count as
+# the same footer while years such as "2025" still have to match exactly
+_PAGE_NUMBER = re.compile(r'\b\d{1,3}\b')
+
+# A bare page number, e.g. "5" or "- 5 -"
+_NUMBER_ONLY = re.compile(r'\W*(\d+)\W*')
 
-{text[:30000]}  # Limit untuk menghindari token limit
+_WHITESPACE = re.compile(r'\s+')
 
-INFORMASI TAMBAHAN DARI USER:
+def _json_loads(json_str: str):
+    """Parse JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(json_str)
+    return json.loads(json_str)
+
+def _json_dumps(data) -> bytes:
+    """Pretty-print JSON as UTF-8 bytes with 2-space indent, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+def _parse_response_json(response_text: str):
+    """Parse the model's JSON output, tolerating a fenced code block"""
+    # JSON mode returns a bare object; keep code-block parsing as a fallback
+    json_match = _JSON_BLOCK.search(response_text)
+    if json_match:
+        json_str = json_match.group(1)
+    else:
+        json_str = response_text
+    
+    return _json_loads(json_str)
+
+def _format_user_inputs(user_inputs: Dict) -> str:
+    """Render the optional sidebar inputs for the user prompt"""
+    return f"""INFORMASI TAMBAHAN DARI USER:
 - Wilayah: {user_inputs.get('wilayah', 'Tidak diisi')}
 - Periode: {user_inputs.get('periode', 'Tidak diisi')}
 - Catatan: {user_inputs.get('catatan', 'Tidak ada')}
+"""
 
-TUGAS:
-Ekstrak metadata sesuai format yang diminta. Prioritaskan akurasi dan konsistensi.
-Jika ada informasi dari user yang bertentangan dengan dokumen, gunakan informasi dari dokumen.
+@st.cache_resource(show_spinner=False)
+def _get_encoding():
+    """Tokenizer of the chat deployment, or None if tiktoken is not installed"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(AZURE_OPENAI_CHAT_DEPLOYMENT)
+    except KeyError:  # Older tiktoken without gpt-4o-mini; same tokenizer as gpt-4o
+        return tiktoken.get_encoding("o200k_base")
+
+def _truncate_document(text: str) -> str:
+    """Trim document text to the prompt budget, by tokens when possible"""
+    try:
+        encoding = _get_encoding()
+    except Exception:
+        # Tokenizer files are downloaded on first use; a failure is raised out
+        # of the cached function so the next call retries instead of caching it
+        encoding = None
+    if encoding is None:
+        return text[:MAX_EXTRACT_CHARS]
+    
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= MAX_PROMPT_TOKENS:
+        return text
+    return encoding.decode(tokens[:MAX_PROMPT_TOKENS])
+
+def _format_table(table: List[List[Optional[str]]]) -> str:
+    """Render a pdfplumber table as pipe-separated lines"""
+    rows = [" | ".join([cell or "" for cell in row]) for row in table if row]
+    return "\n".join(rows) + "\n" if rows else ""
+
+def _normalize_line(line: str, page_num: int) -> str:
+    """Normalize a line for header/footer matching (page numbers vary per page)"""
+    line = " ".join(line.split()).lower()
+    if not any(char.isalpha() for char in line):
+        # Lines without letters (table cells such as "7,32", "1.234.567" or
+        # "12,5%") are a page number only if they equal this page's number;
+        # anything else has to repeat verbatim
+        number_only = _NUMBER_ONLY.fullmatch(line)
+        if number_only and int(number_only.group(1)) == page_num:
+            return "#"
+        return line
+    
+    # Mask the number only when it is the line's single small number, so body
+    # lines that differ in several numbers are never merged
+    if len(_PAGE_NUMBER.findall(line)) == 1:
+        return _PAGE_NUMBER.sub("#", line)
+    return line
+
+def _strip_repeated_lines(page_texts: List[str]) -> List[str]:
+    """Drop header/footer lines that repeat on most pages"""
+    if len(page_texts) < HEADER_FOOTER_MIN_PAGES:
+        return page_texts
+    
+    # Only the first and last few lines of a page are header/footer candidates
+    window = HEADER_FOOTER_WINDOW
+    pages_lines = [text.splitlines(keepends=True) for text in page_texts]
+    counts = Counter()
+    for page_num, lines in enumerate(pages_lines, 1):
+        edges = lines[:window] + lines[-window:]
+        counts.update({_normalize_line(line, page_num) for line in edges if line.strip()})
+    
+    min_count = len(page_texts) * HEADER_FOOTER_MIN_SHARE
+    repeated = {line for line, count in counts.items() if count > min_count}
+    if not repeated:
+        return page_texts
+    
+    stripped = []
+    for page_num, lines in enumerate(pages_lines, 1):
+        last_body = len(lines) - window
+        stripped.append("".join(
+            line for i, line in enumerate(lines)
+            if window <= i < last_body or _normalize_line(line, page_num) not in repeated
+        ))
+    return stripped
+
+def _join_pages(pages, label: str = "") -> str:
+    """Join (page number, text) pairs into one string with page markers"""
+    return "".join(f"\n--- Page {page_num}{label} ---\n{page_text}" for page_num, page_text in pages)
+
+def _looks_like_scanned(page_texts: List[str]) -> bool:
+    """Whether most pages have no text layer (image-only pages)"""
+    blank_pages = sum(1 for page_text in page_texts if not page_text.strip())
+    return blank_pages > len(page_texts) / 2
+
+def _open_pdf(pdf_bytes: memoryview) -> fitz.Document:
+    """Open PDF bytes with PyMuPDF without copying them where supported"""
+    try:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    except TypeError:  # Older PyMuPDF only accepts bytes streams
+        return fitz.open(stream=bytes(pdf_bytes), filetype="pdf")
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _extract_text_cached(digest: bytes, _pdf_bytes: memoryview) -> str:
+    """Extract text from PDF bytes, cached by the upload's content digest"""
+    # Method 1: PyMuPDF for clean text extraction
+    # Pages are read sequentially on purpose: PyMuPDF initialises MuPDF in
+    # single-threaded mode and does not release the GIL, so a thread pool
+    # would be unsafe without being faster
+    with _open_pdf(_pdf_bytes) as doc:
+        page_texts = []
+        extracted_chars = 0
+        for page_num in range(len(doc)):
+            page = doc[page_num]
+            page_text = page.get_text("text")
+            page_texts.append(page_text)
+            
+            # Anything past the prompt budget is truncated anyway
+            extracted_chars += len(page_text)
+            if extracted_chars > EXTRACT_STOP_CHARS:
+                break
+        
+        # Running headers/footers would otherwise eat into the prompt budget
+        page_texts = _strip_repeated_lines(page_texts)
+        text_content = _join_pages(enumerate(page_texts, 1))
+        
+        # Count visible characters only, so page markers and whitespace
+        # padding don't hide a sparse document
+        meaningful_chars = sum(len(_WHITESPACE.sub("", page_text)) for page_text in page_texts)
+        if not meaningful_chars:
+            return ""  # No text layer at all, e.g. a scanned PDF that needs OCR
+        
+        # pdfplumber is much slower than PyMuPDF, so the fallback below only
+        # visits pages where PyMuPDF detects a table, and never image-only PDFs
+        pages_with_tables = []
+        if meaningful_chars < 1000 and not _looks_like_scanned(page_texts):  # Fallback if text is too short
+            pages_with_tables = [i + 1 for i, page in enumerate(doc) if page.find_tables().tables]
+    
+    # Method 2: pdfplumber for tables (if PyMuPDF text is insufficient)
+    # Reads the same in-memory bytes; laparams is left unset because pdfplumber
+    # then skips pdfminer's layout analysis entirely
+    if pages_with_tables:
+        plumber_pages = []
+        with pdfplumber.open(io.BytesIO(_pdf_bytes), pages=pages_with_tables) as pdf:
+            for page in pdf.pages:
+                page_num = page.page_number
+                page_parts = [page.extract_text() or ""]
+                
+                # Extract tables
+                tables = page.extract_tables()
+                for j, table in enumerate(tables):
+                    page_parts.append(f"\n[Table {j+1} on Page {page_num}]\n")
+                    page_parts.append(_format_table(table))
+                plumber_pages.append((page_num, "".join(page_parts)))
+        text_content += _join_pages(plumber_pages, " (pdfplumber)")
+    
+    return text_content
+
+class _MetadataLRU:
+    """Thread-safe LRU of parsed metadata keyed by prompt hash"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def put(self, key: str, metadata: Dict) -> None:
+        with self._lock:
+            self._entries[key] = metadata
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+@st.cache_resource
+def _exact_metadata_cache() -> _MetadataLRU:
+    """Exact-match metadata cache shared across reruns and sessions"""
+    return _MetadataLRU(CACHE_MAX_ENTRIES)
+
+def _exact_cache_key(system_prompt: str, user_prompt: str, user_inputs: Dict) -> str:
+    """Hash everything that is sent to the model into a cache key"""
+    payload = json.dumps([system_prompt, user_prompt, user_inputs], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _get_client(api_key: str) -> AzureOpenAI:
+    """Azure OpenAI client kept for this session, so HTTP connections are reused"""
+    # Held in session_state (not a process-wide cache) so the key never
+    # outlives the session that entered it
+    api_key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    cached = st.session_state.get("azure_client")
+    if cached is not None and cached[0] == api_key_hash:
+        return cached[1]
+    
+    if cached is not None:
+        cached[1].close()  # API key changed; drop the old connection pool
+    client = AzureOpenAI(
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        api_key=api_key,
+        api_version=AZURE_OPENAI_API_VERSION
+    )
+    st.session_state["azure_client"] = (api_key_hash, client)
+    return client
+
+class KFRMetadataExtractor:
+    def __init__(self, api_key: str):
+        self.client = _get_client(api_key)
+    
+    def extract_text_from_pdf(self, pdf_file) -> str:
+        """Extract text from PDF using multiple methods for maximum accuracy"""
+        try:
+            # Zero-copy view over the upload; released before returning
+            with pdf_file.getbuffer() as pdf_bytes:
+                # Key the cache by content so re-runs on the same upload skip parsing
+                digest = hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+                return _extract_text_cached(digest, pdf_bytes)
+            
+        except Exception as e:
+            st.error(f"Error extracting text: {str(e)}")
+            return ""
+    
+    def create_extraction_prompt(self, text: str, user_inputs: Dict) -> Tuple[str, str]:
+        """Create optimized prompt for metadata extraction"""
+        
+        # Static instructions first and the document last, so repeated requests
+        # share a long identical prefix that Azure OpenAI can prompt-cache
+        user_prompt = _USER_PROMPT_HEADER + f"""
+{_truncate_document(text)}
+
+{_format_user_inputs(user_inputs)}
+OUTPUT JSON:
+"""
+        
+        return _SYSTEM_PROMPT, user_prompt
+    
+    def create_batch_prompt(self, texts: List[str], user_inputs_list: List[Dict]) -> Tuple[str, str]:
+        """Create a single prompt covering several documents"""
+        sections = [
+            f"""
+<<<DOC_{i}>>>
+{_truncate_document(text)}
 
+{_format_user_inputs(user_inputs)}"""
+            for i, (text, user_inputs) in enumerate(zip(texts, user_inputs_list))
+        ]
+        user_prompt = _USER_PROMPT_HEADER + "".join(sections) + """
 OUTPUT JSON:
 """
         
-        return system_prompt, user_prompt
+        return _BATCH_SYSTEM_PROMPT, user_prompt
     
     def extract_metadata(self, text: str, user_inputs: Dict) -> Dict:
         """Extract metadata using Azure OpenAI"""
         try:
             system_prompt, user_prompt = self.create_extraction_prompt(text, user_inputs)
             
+            # Reuse the result when exactly the same prompt was sent before
+            cache_key = _exact_cache_key(system_prompt, user_prompt, user_inputs)
+            exact_cache = _exact_metadata_cache()
+            metadata = exact_cache.get(cache_key)
+            if metadata is not None:
+                return metadata
+            
             response = self.client.chat.completions.create(
                 model=AZURE_OPENAI_CHAT_DEPLOYMENT,
                 messages=[
@@ -170,21 +461,28 @@ OUTPUT JSON:
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.1,  # Low temperature for accuracy
-                max_tokens=4000
+                max_tokens=4000,
+                response_format={"type": "json_object"},
+                stream=True
             )
             
-            response_text = response.choices[0].message.content
+            # Show the response as it streams in, throttling UI updates
+            placeholder = st.empty()
+            buf = []
+            last_render = 0.0
+            for chunk in response:
+                if not chunk.choices:  # Azure sends content-filter chunks without choices
+                    continue
+                buf.append(chunk.choices[0].delta.content or "")
+                if time.monotonic() - last_render > STREAM_RENDER_INTERVAL:
+                    placeholder.code("".join(buf), language="json")
+                    last_render = time.monotonic()
+            placeholder.empty()
             
-            # Extract JSON from response
-            json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # Try to find JSON without code blocks
-                json_str = response_text
+            response_text = "".join(buf)
+            metadata = _parse_response_json(response_text)
             
-            # Parse JSON
-            metadata = json.loads(json_str)
+            exact_cache.put(cache_key, metadata)
             return metadata
             
         except json.JSONDecodeError as e:
@@ -195,6 +493,60 @@ OUTPUT JSON:
         except Exception as e:
             st.error(f"Error calling Azure OpenAI: {str(e)}")
             return None
+    
+    def request_metadata_batch(self, texts: List[str], user_inputs_list: List[Dict]) -> List[Optional[Dict]]:
+        """Extract metadata for up to BATCH_MAX_DOCS documents in one request"""
+        # Runs in worker threads, so errors are raised instead of shown with st.*
+        system_prompt, user_prompt = self.create_batch_prompt(texts, user_inputs_list)
+        
+        response = self.client.chat.completions.create(
+            model=AZURE_OPENAI_CHAT_DEPLOYMENT,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.1,  # Low temperature for accuracy
+            max_tokens=BATCH_TOKENS_PER_DOC * len(texts),
+            response_format={"type": "json_object"}
+        )
+        
+        documents = _parse_response_json(response.choices[0].message.content).get("documents") or []
+        
+        # Match results to inputs by doc_index, not position, so a dropped or
+        # merged document can't shift later results onto the wrong file
+        results = [None] * len(texts)
+        for doc in documents:
+            if not isinstance(doc, dict):
+                continue
+            doc_index = doc.pop("doc_index", None)
+            if isinstance(doc_index, int) and 0 <= doc_index < len(texts) and results[doc_index] is None:
+                results[doc_index] = doc
+        return results
+    
+    def extract_metadata_batch(self, texts: List[str], user_inputs_list: List[Dict]) -> List[Optional[Dict]]:
+        """Extract metadata for many documents, BATCH_MAX_DOCS per Azure OpenAI request"""
+        batches = [
+            (texts[i:i + BATCH_MAX_DOCS], user_inputs_list[i:i + BATCH_MAX_DOCS])
+            for i in range(0, len(texts), BATCH_MAX_DOCS)
+        ]
+        if not batches:
+            return []
+        
+        # Batches are independent requests, so send them concurrently
+        with ThreadPoolExecutor(max_workers=min(len(batches), BATCH_MAX_WORKERS)) as executor:
+            futures = [executor.submit(self.request_metadata_batch, *batch) for batch in batches]
+        
+        results = []
+        for (batch_texts, _), future in zip(batches, futures):
+            try:
+                results.extend(future.result())
+            except json.JSONDecodeError as e:
+                st.error(f"Error parsing JSON response: {str(e)}")
+                results.extend([None] * len(batch_texts))
+            except Exception as e:
+                st.error(f"Error calling Azure OpenAI: {str(e)}")
+                results.extend([None] * len(batch_texts))
+        return results
 
 def validate_metadata(metadata: Dict) -> List[str]:
     """Validate extracted metadata and return list of issues"""
@@ -204,12 +556,12 @@ def validate_metadata(metadata: Dict) -> List[str]:
         return ["Metadata is empty or invalid"]
     
     # Check required fields in metadata_umum
-    required_umum = ["judul_dokumen", "periode", "wilayah", "kategori"]
     umum = metadata.get("metadata_umum", {})
-    
-    for field in required_umum:
-        if not umum.get(field):
-            issues.append(f"Missing required field in metadata_umum: {field}")
+    issues.extend(
+        f"Missing required field in metadata_umum: {field}"
+        for field in REQUIRED_UMUM_FIELDS
+        if not umum.get(field)
+    )
     
     # Check consistency between sections
     if metadata.get("metadata_analisis_khusus"):
@@ -221,6 +573,70 @@ def validate_metadata(metadata: Dict) -> List[str]:
     
     return issues
 
+def run_bulk_extraction(api_key: str, uploaded_files: List, user_inputs: Dict):
+    """Extract metadata for several uploaded KFRs using batched requests"""
+    # Stored results only belong to the files they were extracted from
+    file_ids = [uploaded_file.file_id for uploaded_file in uploaded_files or []]
+    if st.session_state.get("bulk_file_ids") != file_ids:
+        st.session_state.pop("bulk_results", None)
+        st.session_state.pop("bulk_file_ids", None)
+    
+    if st.button("🚀 Extract Metadata (Bulk)", type="primary", disabled=not (uploaded_files and api_key)):
+        st.session_state["bulk_results"] = extract_bulk_metadata(api_key, uploaded_files, user_inputs)
+        st.session_state["bulk_file_ids"] = file_ids
+    
+    # Results live in session_state so they survive the rerun that each
+    # download button triggers, without repeating the LLM calls
+    bulk_results = st.session_state.get("bulk_results")
+    if not bulk_results:
+        return
+    
+    st.subheader("📋 Generated Metadata")
+    for i, (file_name, metadata) in enumerate(bulk_results):
+        with st.expander(f"📄 {file_name}", expanded=not metadata):
+            if not metadata:
+                st.error("❌ Gagal mengekstrak metadata untuk dokumen ini.")
+                continue
+            
+            validation_issues = validate_metadata(metadata)
+            if validation_issues:
+                st.warning("⚠️ Issues detected:")
+                for issue in validation_issues:
+                    st.write(f"- {issue}")
+            
+            st.json(metadata)
+            filename = f"metadata_{file_name.replace('.pdf', '')}.json"
+            st.download_button(
+                label="📥 Download JSON",
+                data=_json_dumps(metadata),
+                file_name=filename,
+                mime="application/json",
+                key=f"bulk_download_{i}"
+            )
+
+def extract_bulk_metadata(api_key: str, uploaded_files: List, user_inputs: Dict) -> List[Tuple[str, Optional[Dict]]]:
+    """Return (file name, metadata or None) for each uploaded file"""
+    extractor = KFRMetadataExtractor(api_key)
+    with st.spinner(f"Mengekstrak text dari {len(uploaded_files)} PDF..."):
+        texts = [extractor.extract_text_from_pdf(uploaded_file) for uploaded_file in uploaded_files]
+    
+    documents = []
+    for uploaded_file, text_content in zip(uploaded_files, texts):
+        if text_content.strip():
+            documents.append((uploaded_file.name, text_content))
+        else:
+            st.error(f"Gagal mengekstrak text dari {uploaded_file.name}.")
+    if not documents:
+        return []
+    
+    with st.spinner(f"Mengekstrak metadata {len(documents)} dokumen menggunakan AI..."):
+        results = extractor.extract_metadata_batch(
+            [text_content for _, text_content in documents],
+            [user_inputs] * len(documents)
+        )
+    
+    return [(file_name, metadata) for (file_name, _), metadata in zip(documents, results)]
+
 def main():
     st.title("📊 KFR Metadata Extractor")
     st.markdown("**Ekstraksi metadata otomatis dari dokumen Kajian Fiskal Regional (KFR) DJPb**")
@@ -240,6 +656,10 @@ def main():
         st.subheader("Model Settings")
         temperature = st.slider("Temperature", 0.0, 1.0, 0.1, 0.1)
         max_tokens = st.slider("Max Tokens", 1000, 8000, 4000, 500)
+        bulk_mode = st.toggle(
+            "Bulk mode",
+            help=f"Proses beberapa PDF sekaligus, hingga {BATCH_MAX_DOCS} dokumen per request AI"
+        )
         
         st.divider()
         
@@ -254,24 +674,43 @@ def main():
     
     with col1:
         st.subheader("📄 Upload KFR PDF")
-        uploaded_file = st.file_uploader(
-            "Pilih file PDF KFR",
-            type="pdf",
-            help="Upload dokumen KFR dalam format PDF"
-        )
-        
-        if uploaded_file:
-            st.success(f"File uploaded: {uploaded_file.name}")
-            file_size = len(uploaded_file.getvalue()) / (1024 * 1024)  # Size in MB
-            st.info(f"File size: {file_size:.2f} MB")
+        if bulk_mode:
+            uploaded_file = None
+            uploaded_files = st.file_uploader(
+                "Pilih file PDF KFR",
+                type="pdf",
+                accept_multiple_files=True,
+                help="Upload beberapa dokumen KFR dalam format PDF"
+            )
             
-            if file_size > 50:
-                st.warning("File size besar (>50MB). Processing mungkin memakan waktu lama.")
+            if uploaded_files:
+                total_size = sum(f.size for f in uploaded_files) / (1024 * 1024)  # Size in MB
+                st.success(f"{len(uploaded_files)} files uploaded ({total_size:.2f} MB)")
+        else:
+            uploaded_file = st.file_uploader(
+                "Pilih file PDF KFR",
+                type="pdf",
+                help="Upload dokumen KFR dalam format PDF"
+            )
+            
+            if uploaded_file:
+                st.success(f"File uploaded: {uploaded_file.name}")
+                file_size = uploaded_file.size / (1024 * 1024)  # Size in MB
+                st.info(f"File size: {file_size:.2f} MB")
+                
+                if file_size > 50:
+                    st.warning("File size besar (>50MB). Processing mungkin memakan waktu lama.")
     
     with col2:
         st.subheader("🔧 Processing Controls")
         
-        if st.button("🚀 Extract Metadata", type="primary", disabled=not (uploaded_file and api_key)):
+        if bulk_mode:
+            run_bulk_extraction(api_key, uploaded_files, {
+                "wilayah": wilayah_input,
+                "periode": periode_input,
+                "catatan": catatan_input
+            })
+        elif st.button("🚀 Extract Metadata", type="primary", disabled=not (uploaded_file and api_key)):
             if not api_key:
                 st.error("Silakan masukkan Azure OpenAI API Key di sidebar")
             elif not uploaded_file:
@@ -283,7 +722,7 @@ def main():
                     text_content = extractor.extract_text_from_pdf(uploaded_file)
                 
                 if not text_content.strip():
-                    st.error("Gagal mengekstrak text dari PDF. Pastikan file tidak corrupt atau password-protected.")
+                    st.error("Gagal mengekstrak text dari PDF. Pastikan file tidak corrupt, tidak password-protected, dan bukan hasil scan (memerlukan OCR).")
                 else:
                     st.success(f"Text extracted: {len(text_content)} characters")
                     
@@ -335,8 +774,13 @@ def main():
                         
                         with tab4:
                             st.subheader("Complete JSON Output")
-                            json_output = json.dumps(metadata, indent=2, ensure_ascii=False)
-                            st.text_area("JSON Output:", json_output, height=400)
+                            json_output = _json_dumps(metadata)
+                            
+                            # Only a preview goes to the browser; the download has the full JSON
+                            json_preview = json_output[:JSON_PREVIEW_BYTES].decode("utf-8", errors="ignore")
+                            st.text_area("JSON Output:", json_preview, height=400)
+                            if len(json_output) > JSON_PREVIEW_BYTES:
+                                st.caption("Preview dipotong; gunakan tombol download untuk JSON lengkap.")
                             
                             # Download button
                             filename = f"metadata_{uploaded_file.name.replace('.pdf', '')}.json"
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import app
+
+
+def test_strip_repeated_lines_keeps_numeric_cells_at_page_edges():
+    pages = [
+        f"KFR Provinsi Riau Triwulan I 2025\n{n},{n}2\n{n}.{n}45\nisi halaman {n}\n"
+        f"halaman {n} kalimat 0\n12,{n}%\n1.234.{n:03d}\nhal {n + 1}\n"
+        for n in range(8)
+    ]
+
+    stripped = app._strip_repeated_lines(pages)
+
+    for n, page in enumerate(stripped):
+        lines = page.splitlines()
+        # Running header and page-number footer are removed
+        assert "KFR Provinsi Riau Triwulan I 2025" not in lines
+        assert f"hal {n + 1}" not in lines
+        # Decimal, thousands-separated and percentage cells survive
+        for cell in (f"{n},{n}2", f"{n}.{n}45", f"12,{n}%", f"1.234.{n:03d}"):
+            assert cell in lines
+        assert f"halaman {n} kalimat 0" in lines
+
+
+def test_strip_repeated_lines_drops_bare_page_numbers_only():
+    pages = [f"{n + 1}\n{(n * 7) % 50}\nisi {n}\nmid\nlagi\n{n % 9}\n- {n + 1} -\n" for n in range(10)]
+
+    stripped = app._strip_repeated_lines(pages)
+
+    for n, page in enumerate(stripped):
+        lines = page.splitlines()
+        assert lines[0] != str(n + 1)
+        assert f"- {n + 1} -" not in lines
+        assert str((n * 7) % 50) in lines
+        assert str(n % 9) in lines